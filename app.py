@@ -9,11 +9,231 @@ with multiple buildings and services.
 
 import streamlit as st
 import pandas as pd
-import json
+import numpy as np
 import io
-from openpyxl import load_workbook
+import hashlib
+import orjson
+from openpyxl.utils import column_index_from_string
 from datetime import datetime
-import traceback
+from typing import Any, Callable, Optional
+
+# Column mapping (1-based Excel columns)
+_COLUMN_MAP = {
+    'customer': 'B',           # CUSTOMER
+    'building_id': 'C',        # BUILDING ID  
+    'address': 'D',            # ADDRESS
+    'city': 'E',
+    'state': 'F',              # STATE
+    'zip': 'G',                # ZIP
+    'building_type': 'I',      # BUILDING TYPE
+    'total_sq_ft': 'J',        # TOTAL SQ FOOTAGE
+    'cleanable_sq_ft': 'K',    # CLEANABLE SQ FOOTAGE
+    'alternate_productivity': 'M', # ALTERNATE PRODUCTIVITY
+    
+    # Schedule columns
+    'sun': 'R', 'mon': 'S', 'tue': 'T', 'wed': 'U', 
+    'thu': 'V', 'fri': 'W', 'sat': 'X',
+    
+    # Additional costs
+    'additional_costs': 'AB',  # ADDITIONAL COSTS
+    
+    # Equipment columns
+    'equipment_rental_1': 'AI',  # EQUIPMENT RENTAL #1
+    'contract_terms_1': 'AJ',    # CONTRACT #1 TERMS
+    'equipment_rental_2': 'AK',  # EQUIPMENT RENTAL #2
+    'contract_terms_2': 'AL',    # CONTRACT #2 TERMS
+    
+    # Day Porter columns
+    'wage_adjustment': 'AP',     # WAGE ADJUSTMENT
+    'dp_sun': 'AR', 'dp_mon': 'AS', 'dp_tue': 'AT', 'dp_wed': 'AU',
+    'dp_thu': 'AV', 'dp_fri': 'AW', 'dp_sat': 'AX',
+    
+    # Supervisor columns
+    'sup_sun': 'BA', 'sup_mon': 'BB', 'sup_tue': 'BC', 'sup_wed': 'BD',
+    'sup_thu': 'BE', 'sup_fri': 'BF', 'sup_sat': 'BG',
+}
+
+# Index of each field within a row read from columns B:BG (B -> 0)
+_COL_INDEX: dict[str, int] = {
+    field: column_index_from_string(col) - 2 for field, col in _COLUMN_MAP.items()
+}
+
+# 0-based sheet index of the last mapped column (BG)
+_LAST_COLUMN = max(_COL_INDEX.values()) + 1
+
+# Text fields default to '' when blank; everything else defaults to 0
+_STRING_FIELDS = frozenset(['customer', 'building_id', 'address', 'city', 'state', 'building_type'])
+
+# Fields that might be stored as strings and need converting to numbers
+_NUMERIC_FIELDS = frozenset([
+    'cleanable_sq_ft', 'total_sq_ft', 'zip', 'alternate_productivity',
+    'sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat',
+    'additional_costs', 'wage_adjustment',
+    'dp_sun', 'dp_mon', 'dp_tue', 'dp_wed', 'dp_thu', 'dp_fri', 'dp_sat',
+    'sup_sun', 'sup_mon', 'sup_tue', 'sup_wed', 'sup_thu', 'sup_fri', 'sup_sat',
+])
+
+# Standard assumption for converting monthly costs to weekly
+_WEEKS_PER_MONTH = 4.33
+
+# Equipment contract terms accepted by the API, in months
+_VALID_TERMS = frozenset(('12', '24', '36', '60', 12, 24, 36, 60))
+
+# Schedule column suffixes and the matching API day names
+_DAY_KEYS = ('sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat')
+_DAY_NAMES = ('sunday', 'monday', 'tuesday', 'wednesday', 'thursday', 'friday', 'saturday')
+
+
+def _clean_text(value):
+    """Strip a text cell; blank cells become ''"""
+    if value is None:
+        return ''
+    return value.strip() if isinstance(value, str) else value
+
+
+def _clean_facility_type(value):
+    """Keep the facility type exactly as entered - preserve spacing"""
+    return '' if value is None else value
+
+
+def _clean_number(value):
+    """Convert a numeric cell that might be stored as a string; blank cells become 0"""
+    # Numeric cells are already typed by the reader - only text cells need converting
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        try:
+            return float(value) if value.strip() else 0
+        except ValueError:
+            return 0
+    return 0 if value is None else value
+
+
+def _clean_other(value):
+    """Strip a text cell; blank cells become 0"""
+    if value is None:
+        return 0
+    return value.strip() if isinstance(value, str) else value
+
+
+# Cleanup handler for each field, applied as the row is extracted
+_HANDLERS: dict[str, Callable[[Any], Any]] = {
+    field: (
+        _clean_facility_type if field == 'building_type'
+        else _clean_text if field in _STRING_FIELDS
+        else _clean_number if field in _NUMERIC_FIELDS
+        else _clean_other
+    )
+    for field in _COLUMN_MAP
+}
+
+
+def _weekly_costs(monthly: np.ndarray) -> np.ndarray:
+    """Convert an array of monthly costs to weekly costs"""
+    return monthly / _WEEKS_PER_MONTH
+
+
+def _term(value):
+    """Map an equipment contract term to API format ('' if not a valid term)"""
+    return str(int(value)) if value in _VALID_TERMS else ''
+
+
+def _day_records(df, prefix=''):
+    """Return one sunday..saturday dict per row for the prefixed day columns"""
+    columns = dict(zip((f'{prefix}{day}' for day in _DAY_KEYS), _DAY_NAMES))
+    return df[list(columns)].rename(columns=columns).to_dict(orient='records')
+
+
+# Parsed passports are cached across all sessions - bound how many are kept
+# in server memory and for how long (seconds)
+_CACHE_MAX_ENTRIES = 32
+_CACHE_TTL = 60 * 60
+
+
+def _file_digest(file_bytes: bytes) -> str:
+    """Content hash of an uploaded file, used as its cache key"""
+    return hashlib.blake2b(file_bytes, digest_size=16).hexdigest()
+
+
+@st.cache_data(show_spinner=False, max_entries=_CACHE_MAX_ENTRIES, ttl=_CACHE_TTL)
+def _parse_passport(file_digest: str, _file_bytes: bytes) -> Optional[tuple[list[dict], dict]]:
+    """Parse passport file bytes into building rows and customer info
+    
+    Cached on the file's content digest so Streamlit reruns don't re-read the
+    workbook; the bytes themselves are not hashed again (leading underscore).
+    Returns None if the workbook has no 'Janitorial Services' sheet.
+    """
+    # Open the workbook with the Rust-backed calamine reader
+    excel_file = pd.ExcelFile(io.BytesIO(_file_bytes), engine='calamine')
+    
+    # Check if 'Janitorial Services' sheet exists
+    if 'Janitorial Services' not in excel_file.sheet_names:
+        return None
+    
+    # Read rows from 4 onward as raw cell values, padded out to columns B:BG
+    df = excel_file.parse(
+        'Janitorial Services',
+        header=None,
+        skiprows=3,
+        dtype=object,
+    ).reindex(columns=range(1, _LAST_COLUMN + 1)).astype(object)
+    df = df.where(df.notna(), None)
+    
+    buildings_data = []
+    customer_name = None
+    blank_streak = 0
+    
+    # Extract data starting from row 4
+    for row, values in enumerate(df.itertuples(index=False, name=None), start=4):
+        # Limit to prevent runaway scans, leaving room for large sheets
+        if row > max(100, 2 * len(buildings_data)):
+            break
+        
+        customer = values[_COL_INDEX['customer']]
+        building_id = values[_COL_INDEX['building_id']]
+        has_building_id = bool(building_id) and str(building_id).strip() != ''
+        
+        # Once data has started, two consecutive rows without customer or
+        # building ID end it; blank rows before the first building are skipped
+        if not customer and not has_building_id:
+            if buildings_data:
+                blank_streak += 1
+                if blank_streak >= 2:
+                    break
+            continue
+        blank_streak = 0
+        
+        # Check if there's a customer name
+        if not customer:
+            continue
+        
+        # Check if building ID exists (essential field)
+        if not has_building_id:
+            continue
+        
+        # Check if cleanable square footage exists and is valid
+        cleanable_sq_ft = values[_COL_INDEX['cleanable_sq_ft']]
+        if not cleanable_sq_ft or cleanable_sq_ft == 0:
+            continue
+        
+        # Extract and clean all data using column mapping
+        building_data = {field: _HANDLERS[field](values[idx]) for field, idx in _COL_INDEX.items()}
+        
+        # Store customer name from first row
+        if customer_name is None:
+            customer_name = building_data['customer']
+        
+        buildings_data.append(building_data)
+    
+    # Store customer info
+    customer_info = {}
+    if buildings_data:
+        customer_info = {
+            'customer_name': customer_name or "Unknown Customer"
+        }
+    
+    return buildings_data, customer_info
+
 
 class ExcelToJSONConverter:
     """Convert Excel Passport data to API JSON format"""
@@ -21,128 +241,19 @@ class ExcelToJSONConverter:
     def __init__(self):
         self.buildings_data = []
         self.customer_info = {}
+        self.df = pd.DataFrame(columns=list(_COLUMN_MAP), dtype=object)
         
-    def load_excel_data(self, uploaded_file):
-        """Load and parse Excel data from uploaded file"""
+    def load_excel_data(self, file_bytes, file_digest=None):
+        """Load and parse Excel data from the uploaded file's bytes"""
         try:
-            # Load workbook from uploaded file
-            wb = load_workbook(uploaded_file, data_only=True)
+            parsed = _parse_passport(file_digest or _file_digest(file_bytes), file_bytes)
             
             # Check if 'Janitorial Services' sheet exists
-            if 'Janitorial Services' not in wb.sheetnames:
+            if parsed is None:
                 st.error("Excel file must contain a 'Janitorial Services' sheet")
                 return False
-                
-            ws = wb['Janitorial Services']
-            
-            # Column mapping (1-based Excel columns)
-            column_map = {
-                'customer': 'B',           # CUSTOMER
-                'building_id': 'C',        # BUILDING ID  
-                'address': 'D',            # ADDRESS
-                'city': 'E',
-                'state': 'F',              # STATE
-                'zip': 'G',                # ZIP
-                'building_type': 'I',      # BUILDING TYPE
-                'total_sq_ft': 'J',        # TOTAL SQ FOOTAGE
-                'cleanable_sq_ft': 'K',    # CLEANABLE SQ FOOTAGE
-                'alternate_productivity': 'M', # ALTERNATE PRODUCTIVITY
-                
-                # Schedule columns
-                'sun': 'R', 'mon': 'S', 'tue': 'T', 'wed': 'U', 
-                'thu': 'V', 'fri': 'W', 'sat': 'X',
-                
-                # Additional costs
-                'additional_costs': 'AB',  # ADDITIONAL COSTS
-                
-                # Equipment columns
-                'equipment_rental_1': 'AI',  # EQUIPMENT RENTAL #1
-                'contract_terms_1': 'AJ',    # CONTRACT #1 TERMS
-                'equipment_rental_2': 'AK',  # EQUIPMENT RENTAL #2
-                'contract_terms_2': 'AL',    # CONTRACT #2 TERMS
-                
-                # Day Porter columns
-                'wage_adjustment': 'AP',     # WAGE ADJUSTMENT
-                'dp_sun': 'AR', 'dp_mon': 'AS', 'dp_tue': 'AT', 'dp_wed': 'AU',
-                'dp_thu': 'AV', 'dp_fri': 'AW', 'dp_sat': 'AX',
-                
-                # Supervisor columns
-                'sup_sun': 'BA', 'sup_mon': 'BB', 'sup_tue': 'BC', 'sup_wed': 'BD',
-                'sup_thu': 'BE', 'sup_fri': 'BF', 'sup_sat': 'BG',
-            }
-            
-            self.buildings_data = []
-            customer_name = None
             
-            # Extract data starting from row 4
-            row = 4
-            while row <= ws.max_row and row <= 100:  # Limit to prevent infinite loop
-                # Check if there's a customer name
-                customer_cell = ws[f'B{row}']
-                if not customer_cell.value:
-                    row += 1
-                    continue
-                
-                # Check if building ID exists (essential field)
-                building_id_cell = ws[f'C{row}']
-                if not building_id_cell.value or str(building_id_cell.value).strip() == '':
-                    row += 1
-                    continue
-                
-                # Check if cleanable square footage exists and is valid
-                cleanable_sq_ft_cell = ws[f'K{row}']
-                if not cleanable_sq_ft_cell.value or cleanable_sq_ft_cell.value == 0:
-                    row += 1
-                    continue
-                    
-                building_data = {}
-                
-                # Extract all data using column mapping
-                for field, col in column_map.items():
-                    cell = ws[f'{col}{row}']
-                    value = cell.value
-                    
-                    # Clean up the value - preserve spacing for facility types
-                    if value is None:
-                        building_data[field] = '' if field in ['customer', 'building_id', 'address', 'city', 'state', 'building_type'] else 0
-                    elif isinstance(value, str):
-                        # Don't strip building_type (facility type) - preserve exact spacing
-                        if field == 'building_type':
-                            building_data[field] = value
-                        else:
-                            building_data[field] = value.strip()
-                    else:
-                        building_data[field] = value
-                
-                # Convert numeric fields that might be stored as strings
-                numeric_fields = ['cleanable_sq_ft', 'total_sq_ft', 'zip', 'alternate_productivity',
-                                'sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat',
-                                'additional_costs', 'wage_adjustment',
-                                'dp_sun', 'dp_mon', 'dp_tue', 'dp_wed', 'dp_thu', 'dp_fri', 'dp_sat',
-                                'sup_sun', 'sup_mon', 'sup_tue', 'sup_wed', 'sup_thu', 'sup_fri', 'sup_sat']
-                
-                for field in numeric_fields:
-                    if field in building_data and building_data[field] == '':
-                        building_data[field] = 0
-                    elif field in building_data and isinstance(building_data[field], str):
-                        try:
-                            building_data[field] = float(building_data[field])
-                        except ValueError:
-                            building_data[field] = 0
-                
-                # Store customer name from first row
-                if customer_name is None:
-                    customer_name = building_data['customer']
-                
-                self.buildings_data.append(building_data)
-                row += 1
-            
-            # Store customer info
-            if self.buildings_data:
-                self.customer_info = {
-                    'customer_name': customer_name or "Unknown Customer"
-                }
-                
+            self.set_data(*parsed)
             return True
             
         except Exception as e:
@@ -150,126 +261,51 @@ class ExcelToJSONConverter:
             st.error("Please ensure the file is a valid Excel file with the correct format.")
             return False
     
-    def convert_to_api_json(self):
-        """Convert loaded Excel data to API JSON format"""
+    def set_data(self, buildings_data, customer_info):
+        """Set already-parsed building rows and customer info"""
+        self.buildings_data = buildings_data
+        self.customer_info = customer_info
+        
+        # Keep a column-wise copy of the cleaned rows for the JSON build
+        self.df = pd.DataFrame(buildings_data, columns=list(_COLUMN_MAP), dtype=object)
+    
+    def convert_to_api_json(self, deal_ts=None):
+        """Convert loaded Excel data to API JSON format
+        
+        deal_ts is the '%Y%m%d_%H%M%S' timestamp used in the deal record ID;
+        pass a fixed value to get the same ID on every call.
+        """
         if not self.buildings_data:
             return None
         
         # Get customer name and create record IDs
         customer_name = self.customer_info.get('customer_name', 'Unknown Customer')
-        deal_record_id = f"DEAL_{customer_name}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        if deal_ts is None:
+            deal_ts = datetime.now().strftime('%Y%m%d_%H%M%S')
+        deal_record_id = f"DEAL_{customer_name}_{deal_ts}"
         customer_record_id = f"CUST_{customer_name}"
         
-        buildings = []
+        # Derive the per-building values column-wise across all buildings
+        df = self.df.copy()
+        building_ids = df['building_id'].astype(str)
+        df['building_record_id'] = 'BLDG_' + building_ids
+        df['line_item_id'] = 'LINE_' + building_ids
+        df['building_name'] = f"{customer_name} - " + building_ids
         
-        for i, building_data in enumerate(self.buildings_data):
-            # Map contract terms to API format
-            contract_terms_map = {
-                '12': '12', '24': '24', '36': '36', '60': '60',
-                12: '12', 24: '24', 36: '36', 60: '60'
-            }
-            
-            # Equipment mapping
-            equipment = []
-            if building_data.get('equipment_rental_1'):
-                equipment.append({
-                    "equipmentType": building_data['equipment_rental_1'],
-                    "contractTerm": contract_terms_map.get(building_data.get('contract_terms_1', ''), '')
-                })
-            if building_data.get('equipment_rental_2'):
-                equipment.append({
-                    "equipmentType": building_data['equipment_rental_2'],
-                    "contractTerm": contract_terms_map.get(building_data.get('contract_terms_2', ''), '')
-                })
-            
-            # Day porter hours
-            dayporter_hours = {
-                "sunday": building_data.get('dp_sun', 0),
-                "monday": building_data.get('dp_mon', 0),
-                "tuesday": building_data.get('dp_tue', 0),
-                "wednesday": building_data.get('dp_wed', 0),
-                "thursday": building_data.get('dp_thu', 0),
-                "friday": building_data.get('dp_fri', 0),
-                "saturday": building_data.get('dp_sat', 0)
-            }
-            
-            # Supervisor hours
-            supervisor_hours = {
-                "sunday": building_data.get('sup_sun', 0),
-                "monday": building_data.get('sup_mon', 0),
-                "tuesday": building_data.get('sup_tue', 0),
-                "wednesday": building_data.get('sup_wed', 0),
-                "thursday": building_data.get('sup_thu', 0),
-                "friday": building_data.get('sup_fri', 0),
-                "saturday": building_data.get('sup_sat', 0)
-            }
-            
-            # Productivity override
-            productivity_override = {}
-            if building_data.get('alternate_productivity'):
-                productivity_override = {
-                    "value": building_data['alternate_productivity']
-                }
-            
-            # Convert monthly additional costs to weekly for API
-            monthly_additional_costs = building_data.get('additional_costs', 0)
-            weeks_per_month = 4.33  # Standard assumption
-            weekly_additional_costs = monthly_additional_costs / weeks_per_month if weeks_per_month > 0 else 0
-            
-            # Cost adjustments
-            cost_adjustments = {
-                "hourlyWageAdjustment": 0,  # Not specified in mapping
-                "weeklyAdditionalCosts": weekly_additional_costs
-            }
-            
-            # Create building object
-            building = {
-                "buildingRecordId": f"BLDG_{building_data['building_id']}",
-                "buildingId": str(building_data['building_id']),
-                "buildingName": f"{customer_name} - {building_data['building_id']}",
-                "facilityType": building_data['building_type'],
-                "location": {
-                    "state": building_data['state'],
-                    "postalCode": str(int(building_data['zip'])) if building_data['zip'] else "",
-                    "address": building_data['address'],
-                    "city": building_data['city'],
-                    "country": "USA",
-                },
-                "buildingDetails": {
-                    "totalSquareFootage": building_data.get('total_sq_ft', 0),
-                    "cleanableSquareFootage": building_data['cleanable_sq_ft']
-                },
-                "services": [
-                    {
-                        "lineItemObjectId": f"LINE_{building_data['building_id']}",
-                        "serviceType": "RJS",
-                        "serviceFrequency": "weekly",
-                        "schedule": {
-                            "sunday": building_data.get('sun', 0),
-                            "monday": building_data.get('mon', 0),
-                            "tuesday": building_data.get('tue', 0),
-                            "wednesday": building_data.get('wed', 0),
-                            "thursday": building_data.get('thu', 0),
-                            "friday": building_data.get('fri', 0),
-                            "saturday": building_data.get('sat', 0)
-                        },
-                        "inputs": [
-                            {
-                                "itemName": "cleanableSquareFootage",
-                                "itemValue": building_data['cleanable_sq_ft']
-                            }
-                        ],
-                        "productivityOverride": productivity_override,
-                        "costAdjustments": cost_adjustments,
-                        "equipment": equipment,
-                        "dayporterHours": dayporter_hours,
-                        "dayporterHourlyWageAdjustment": building_data.get('wage_adjustment', 0),
-                        "supervisorHours": supervisor_hours
-                    }
-                ]
-            }
-            
-            buildings.append(building)
+        # US ZIP codes keep their leading zeros (2134 -> '02134')
+        zips = df['zip'].to_numpy(dtype=np.float64)
+        postal_codes = pd.Series(zips.astype(np.int64), index=df.index).astype(str).str.zfill(5)
+        df['postal_code'] = np.where(zips != 0, postal_codes, '')
+        
+        # Convert monthly additional costs to weekly for API
+        df['weekly_additional_costs'] = _weekly_costs(df['additional_costs'].to_numpy(dtype=np.float64))
+        
+        # Schedule, day porter and supervisor hours as sunday..saturday dicts
+        df['schedule'] = _day_records(self.df)
+        df['dayporter_hours'] = _day_records(self.df, 'dp_')
+        df['supervisor_hours'] = _day_records(self.df, 'sup_')
+        
+        buildings = [self._building_json(building_data) for building_data in df.to_dict(orient='records')]
         
         # Create final API JSON structure
         api_json = {
@@ -279,6 +315,86 @@ class ExcelToJSONConverter:
         }
         
         return api_json
+    
+    def _building_json(self, building_data):
+        """Build the API JSON object for one building row"""
+        # Equipment mapping
+        equipment = []
+        if building_data['equipment_rental_1']:
+            equipment.append({
+                "equipmentType": building_data['equipment_rental_1'],
+                "contractTerm": _term(building_data['contract_terms_1'])
+            })
+        if building_data['equipment_rental_2']:
+            equipment.append({
+                "equipmentType": building_data['equipment_rental_2'],
+                "contractTerm": _term(building_data['contract_terms_2'])
+            })
+        
+        # Productivity override
+        productivity_override = {}
+        if building_data['alternate_productivity']:
+            productivity_override = {
+                "value": building_data['alternate_productivity']
+            }
+        
+        # Cost adjustments
+        cost_adjustments = {
+            "hourlyWageAdjustment": 0,  # Not specified in mapping
+            "weeklyAdditionalCosts": building_data['weekly_additional_costs']
+        }
+        
+        return {
+            "buildingRecordId": building_data['building_record_id'],
+            "buildingId": str(building_data['building_id']),
+            "buildingName": building_data['building_name'],
+            "facilityType": building_data['building_type'],
+            "location": {
+                "state": building_data['state'],
+                "postalCode": building_data['postal_code'],
+                "address": building_data['address'],
+                "city": building_data['city'],
+                "country": "USA",
+            },
+            "buildingDetails": {
+                "totalSquareFootage": building_data['total_sq_ft'],
+                "cleanableSquareFootage": building_data['cleanable_sq_ft']
+            },
+            "services": [
+                {
+                    "lineItemObjectId": building_data['line_item_id'],
+                    "serviceType": "RJS",
+                    "serviceFrequency": "weekly",
+                    "schedule": building_data['schedule'],
+                    "inputs": [
+                        {
+                            "itemName": "cleanableSquareFootage",
+                            "itemValue": building_data['cleanable_sq_ft']
+                        }
+                    ],
+                    "productivityOverride": productivity_override,
+                    "costAdjustments": cost_adjustments,
+                    "equipment": equipment,
+                    "dayporterHours": building_data['dayporter_hours'],
+                    "dayporterHourlyWageAdjustment": building_data['wage_adjustment'],
+                    "supervisorHours": building_data['supervisor_hours']
+                }
+            ]
+        }
+
+# Characters in the customer name replaced to make a safe download filename
+_FILENAME_SAFE = str.maketrans(' /', '__')
+
+def _dumps(obj):
+    """Serialize to 2-space indented UTF-8 JSON bytes"""
+    return orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+
+@st.cache_data(show_spinner=False, max_entries=_CACHE_MAX_ENTRIES, ttl=_CACHE_TTL)
+def _convert_passport(file_digest: str, deal_ts: str, _file_bytes: bytes) -> Optional[dict]:
+    """Convert passport file bytes to API JSON, cached on the file's content digest"""
+    converter = ExcelToJSONConverter()
+    converter.set_data(*_parse_passport(file_digest, _file_bytes))
+    return converter.convert_to_api_json(deal_ts=deal_ts)
 
 def main():
     """Main Streamlit application"""
@@ -306,12 +422,22 @@ def main():
     if uploaded_file is not None:
         st.success(f"✅ File uploaded: {uploaded_file.name}")
         
+        # Read the upload once and share the bytes across the run
+        file_bytes = uploaded_file.getvalue()
+        
+        # Use file content hash for unique keys instead of timestamp
+        file_digest = _file_digest(file_bytes)
+        file_hash = file_digest[:8]
+        
+        # Fix the deal timestamp per upload so reruns keep the same deal ID
+        deal_ts = st.session_state.setdefault(f"deal_ts_{file_hash}", datetime.now().strftime('%Y%m%d_%H%M%S'))
+        
         # Initialize converter
         converter = ExcelToJSONConverter()
         
         # Load and process the Excel file
         with st.spinner("Processing Excel file..."):
-            if converter.load_excel_data(uploaded_file):
+            if converter.load_excel_data(file_bytes, file_digest):
                 st.success(f"✅ Successfully loaded {len(converter.buildings_data)} building(s)")
                 
                 # Display summary
@@ -323,7 +449,7 @@ def main():
                     st.metric("Total Buildings", len(converter.buildings_data))
                 
                 with col2:
-                    total_sq_ft = sum(b.get('cleanable_sq_ft', 0) for b in converter.buildings_data)
+                    total_sq_ft = converter.df['cleanable_sq_ft'].to_numpy(dtype=np.float64).sum()
                     st.metric("Total Cleanable Sq Ft", f"{total_sq_ft:,.0f}")
                 
                 # Show building details
@@ -340,16 +466,28 @@ def main():
                                 st.write(f"**City:** {building.get('city', 'N/A')}")
                                 st.write(f"**State:** {building.get('state', 'N/A')}")
                             with col3:
-                                schedule = [f"{day}: {building.get(day, 0)}" for day in ['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat'] if building.get(day, 0) > 0]
+                                schedule = [f"{day}: {building[day]}" for day in _DAY_KEYS if building[day] > 0]
                                 st.write(f"**Schedule:** {', '.join(schedule) if schedule else 'No schedule'}")
                 
                 # Generate JSON
                 st.header("3. Generated JSON")
                 
                 try:
-                    api_json = converter.convert_to_api_json()
+                    api_json = _convert_passport(file_digest, deal_ts, file_bytes)
                     
                     if api_json:
+                        # Serialize the JSON once per file and reuse it across reruns
+                        bytes_key = f"json_bytes_{file_hash}"
+                        if bytes_key not in st.session_state:
+                            st.session_state[bytes_key] = _dumps(api_json)
+                        json_bytes = st.session_state[bytes_key]
+                        
+                        # Decode once for the code blocks and keep that across reruns too
+                        text_key = f"json_{file_hash}"
+                        if text_key not in st.session_state:
+                            st.session_state[text_key] = json_bytes.decode('utf-8')
+                        json_string = st.session_state[text_key]
+                        
                         # Display JSON in tabs
                         tab1, tab2, tab3 = st.tabs(["📋 Formatted JSON", "📝 Raw JSON", "📥 Download"])
                         
@@ -357,21 +495,13 @@ def main():
                             st.json(api_json)
                         
                         with tab2:
-                            json_string = json.dumps(api_json, indent=2)
                             st.code(json_string, language='json')
                         
                         with tab3:
                             st.subheader("Download & Copy Options")
                             
-                            # Prepare JSON string once
-                            json_string = json.dumps(api_json, indent=2)
-                            
-                            # Use file hash for unique key instead of timestamp
-                            import hashlib
-                            file_hash = hashlib.md5(uploaded_file.name.encode()).hexdigest()[:8]
-                            
                             # Generate filename
-                            customer_safe = converter.customer_info.get('customer_name', 'Unknown').replace(' ', '_').replace('/', '_')
+                            customer_safe = converter.customer_info.get('customer_name', 'Unknown').translate(_FILENAME_SAFE)
                             filename = f"{customer_safe}_api_input.json"
                             
                             # Alternative download approach - show the data and let browser handle it
@@ -386,7 +516,7 @@ def main():
                                 # Always show download button after JSON is ready
                                 st.download_button(
                                     label="⬇️ Download JSON File",
-                                    data=json_string.encode('utf-8'),
+                                    data=json_bytes,
                                     file_name=filename,
                                     mime="application/json",
                                     key=f"download_{file_hash}"
@@ -440,16 +570,17 @@ def main():
                             st.metric("Buildings Processed", len(api_json.get('buildings', [])))
                         
                         with col2:
-                            services_count = sum(len(b.get('services', [])) for b in api_json.get('buildings', []))
+                            # One RJS service per building
+                            services_count = len(api_json['buildings'])
                             st.metric("Total Services", services_count)
                         
                         with col3:
-                            equipment_count = sum(len(s.get('equipment', [])) for b in api_json.get('buildings', []) for s in b.get('services', []))
+                            equipment_count = int(converter.df[['equipment_rental_1', 'equipment_rental_2']].astype(bool).to_numpy().sum())
                             st.metric("Equipment Items", equipment_count)
                         
                         with col4:
-                            json_size = len(json.dumps(api_json))
-                            st.metric("JSON Size", f"{json_size:,} chars")
+                            json_size = len(json_bytes)
+                            st.metric("JSON Size", f"{json_size:,} bytes")
                         
                     else:
                         st.error("❌ Failed to generate JSON from Excel data")
@@ -457,6 +588,8 @@ def main():
                 except Exception as e:
                     st.error(f"❌ Error generating JSON: {str(e)}")
                     with st.expander("Debug Information"):
+                        # Imported here - only needed on this rarely-hit error path
+                        import traceback
                         st.code(traceback.format_exc())
             else:
                 st.error("❌ Failed to load Excel file. Please check the file format and try again.")
@@ -470,7 +603,8 @@ def main():
             **Your Excel file must contain:**
             
             - A sheet named **"Janitorial Services"**
-            - Data starting from **row 4**
+            - Data starting from **row 4** (leading blank rows are skipped)
+            - Two consecutive blank rows after the first building end the data
             - Specific columns in the expected positions (B, C, D, etc.)
             
             **Expected columns:**